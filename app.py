@@ -77,7 +77,7 @@ from diffusers_helper .thread_utils import AsyncStream ,async_run
 from diffusers_helper .gradio .progress_bar import make_progress_bar_css ,make_progress_bar_html 
 from transformers import SiglipImageProcessor ,SiglipVisionModel 
 from diffusers_helper .clip_vision import hf_clip_vision_encode 
-from diffusers_helper .load_lora import load_lora ,set_adapters, unload_all_loras, apply_lora_scaling
+from diffusers_helper .load_lora import load_lora ,set_adapters, unload_all_loras, apply_lora_scaling, forget_lora_layers
 from pathlib import PurePath 
 from diffusers_helper .bucket_tools import find_nearest_bucket 
 from PIL import ImageOps
@@ -400,7 +400,7 @@ def refresh_loras ():
     lora_options =scan_lora_files ()
     return gr .update (choices =[name for name ,_ in lora_options ],value ="None")
 
-def safe_unload_lora (model ,device =None ):
+def safe_unload_lora (model ,device =None ,release_memory =False ):
 
     if device is not None :
         model .to (device )
@@ -411,7 +411,7 @@ def safe_unload_lora (model ,device =None ):
         # First try the new unload_all_loras function
         if hasattr(model, 'peft_config') and model.peft_config:
             print("Using new unload_all_loras method")
-            unload_all_loras(model)
+            unload_all_loras(model, release_memory=release_memory)
             return True
 
         # Handle DynamicSwap models
@@ -427,7 +427,7 @@ def safe_unload_lora (model ,device =None ):
             # Try new method on internal model
             if hasattr(internal_model, 'peft_config') and internal_model.peft_config:
                 print("Using new unload_all_loras method on internal model")
-                unload_all_loras(internal_model)
+                unload_all_loras(internal_model, release_memory=release_memory)
                 
                 # Clear wrapper state
                 if hasattr (model ,"peft_config"):model .peft_config ={}
@@ -452,6 +452,9 @@ def safe_unload_lora (model ,device =None ):
                 unloaded_internal =True 
 
             if unloaded_internal :
+                # Drop the cached LoRA layer list so it no longer pins the removed layers
+                forget_lora_layers (internal_model )
+                forget_lora_layers (model )
                 if hasattr (model ,"peft_config"):model .peft_config ={}
                 if hasattr (model ,"active_adapters"):model .active_adapters =[]
                 print ("Cleared LoRA state on DynamicSwap wrapper.")
@@ -464,6 +467,7 @@ def safe_unload_lora (model ,device =None ):
         elif hasattr (model ,"unload_lora_weights"):
             print ("Unloading LoRA using unload_lora_weights method")
             model .unload_lora_weights ()
+            forget_lora_layers (model )
 
             if hasattr (model ,"disable_adapters"):
                 model .disable_adapters ()
@@ -528,6 +532,7 @@ def force_remove_lora_modules (model ):
                             print (f"Restored original top-level module for {name}")
 
         for m in [model ,model_to_check ]:
+             forget_lora_layers (m )
              if hasattr (m ,"peft_config"):
                  m .peft_config ={}
                  print (f"Cleared peft_config on {type(m).__name__}")
@@ -2094,7 +2099,7 @@ def switch_active_model (target_model_display_name :str ,progress =gr .Progress
                     transformer .to (cpu )
                     torch .cuda .empty_cache ()
 
-            unload_success =safe_unload_lora (transformer ,cpu )
+            unload_success =safe_unload_lora (transformer ,cpu ,release_memory =True )
             if unload_success :
                 active_loras_before_unload = [info["adapter_name"] for info in currently_loaded_lora_info if info["adapter_name"]]
                 if active_loras_before_unload:
@@ -1,11 +1,432 @@
+import importlib
+import os
+import re
+import sys
+import warnings
+from collections import OrderedDict
 from pathlib import Path, PurePath
-from typing import Dict, List, Optional, Union
-from diffusers.loaders.lora_pipeline import _fetch_state_dict
-from diffusers.loaders.lora_conversion_utils import _convert_hunyuan_video_lora_to_diffusers
-from diffusers.utils.peft_utils import set_weights_and_activate_adapters
-from diffusers.loaders.peft import _SET_ADAPTER_SCALE_FN_MAPPING
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from safetensors import safe_open
+import safetensors.torch
 import torch
 
+
+# The diffusers loader modules pull in a large part of its import graph, so they are
+# only imported the first time a LoRA function needs them.
+_LAZY_IMPORTS = {
+    "_fetch_state_dict": "diffusers.loaders.lora_pipeline",
+    "_convert_hunyuan_video_lora_to_diffusers": "diffusers.loaders.lora_conversion_utils",
+    "is_peft_version": "diffusers.utils",
+    "set_weights_and_activate_adapters": "diffusers.utils.peft_utils",
+    "_SET_ADAPTER_SCALE_FN_MAPPING": "diffusers.loaders.peft",
+}
+_LAZY = {}
+
+
+def _lazy(name: str):
+    if name not in _LAZY:
+        _LAZY[name] = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    return _LAZY[name]
+
+
+# LoRA hot-swapping allocates and frees many differently sized tensors, which
+# fragments the CUDA caching allocator. Expandable segments let it grow and merge
+# segments instead, without the cost of torch.cuda.empty_cache(). A value set by
+# the user always wins; the allocator does not support this on Windows.
+_CUDA_ALLOC_CONF = "expandable_segments:True,max_split_size_mb:512"
+
+if sys.platform != "win32" and "PYTORCH_CUDA_ALLOC_CONF" not in os.environ:
+    os.environ["PYTORCH_CUDA_ALLOC_CONF"] = _CUDA_ALLOC_CONF
+    if torch.cuda.is_initialized():
+        try:
+            torch.cuda.memory._set_allocator_settings(_CUDA_ALLOC_CONF)
+        except (AttributeError, RuntimeError):
+            warnings.warn(
+                "CUDA was initialized before diffusers_helper.load_lora was imported, so "
+                f"PYTORCH_CUDA_ALLOC_CONF={_CUDA_ALLOC_CONF} has no effect. "
+                "Set it in the environment before launching to reduce fragmentation when swapping LoRAs."
+            )
+
+
+def _read_safetensors(path: str, device: Union[str, torch.device] = "cpu", dtype: Optional[torch.dtype] = None) -> Dict[str, torch.Tensor]:
+    """
+    Read a safetensors file straight onto `device`, casting floating point tensors to `dtype`.
+
+    Tensors are pulled one by one from the memory-mapped file, so no intermediate
+    CPU copy of the whole state dict is built when `device` is a GPU. On slow or
+    network filesystems set FP_LORA_READ_WHOLE_FILE=1 to read the file with one
+    large sequential read instead of many small page faults.
+    """
+    if os.environ.get("FP_LORA_READ_WHOLE_FILE") == "1":
+        with open(path, "rb") as f:
+            state_dict = safetensors.torch.load(f.read())
+        return {k: _to(v, device, dtype) for k, v in state_dict.items()}
+
+    if torch.device(device).type == "cuda":
+        return _read_safetensors_to_cuda(path, torch.device(device), dtype)
+
+    with safe_open(path, framework="pt", device=str(device)) as f:
+        return {k: _to(f.get_tensor(k), device, dtype) for k in f.keys()}
+
+
+def _read_safetensors_to_cuda(path: str, device: torch.device, dtype: Optional[torch.dtype] = None) -> Dict[str, torch.Tensor]:
+    """
+    Read a safetensors file onto a CUDA device, overlapping disk reads with uploads.
+
+    Each tensor is read from the memory map into a pinned buffer and its
+    host-to-device copy is queued on a side stream, so the host goes on to read
+    the next tensor while the previous one is in flight, and the uploads don't
+    wait behind work already queued on the current stream. The destinations are
+    allocated on the side stream and marked with record_stream() for the current
+    stream, which waits for the side stream before the converter touches them.
+    """
+    current_stream = torch.cuda.current_stream(device)
+    copy_stream = _get_copy_stream(device)
+    state_dict = {}
+    with safe_open(path, framework="pt", device="cpu") as f, torch.cuda.stream(copy_stream):
+        for k in f.keys():
+            src = f.get_tensor(k).pin_memory()
+            dst = torch.empty(src.shape, dtype=dtype if dtype is not None and src.is_floating_point() else src.dtype, device=device)
+            dst.copy_(src, non_blocking=True)
+            dst.record_stream(current_stream)
+            state_dict[k] = dst
+    current_stream.wait_stream(copy_stream)
+    return state_dict
+
+
+_COPY_STREAMS: Dict[torch.device, "torch.cuda.Stream"] = {}
+
+
+def _get_copy_stream(device: torch.device) -> "torch.cuda.Stream":
+    if device not in _COPY_STREAMS:
+        _COPY_STREAMS[device] = torch.cuda.Stream(device=device)
+    return _COPY_STREAMS[device]
+
+
+def _to(tensor: torch.Tensor, device: Union[str, torch.device], dtype: Optional[torch.dtype] = None) -> torch.Tensor:
+    if dtype is None or not tensor.is_floating_point():
+        return tensor.to(device=device)
+    return tensor.to(device=device, dtype=dtype)
+
+
+def _read_lora_file(lora_path: Path, weight_name: str, device: Union[str, torch.device] = "cpu", dtype: Optional[torch.dtype] = None, cache_key: Optional[Tuple[str, int, int]] = None) -> Dict[str, torch.Tensor]:
+    """
+    Read a HunyuanVideo LoRA file and convert its keys to the diffusers layout.
+
+    Args:
+        lora_path (Path): Directory containing the LoRA file.
+        weight_name (str): File name of the LoRA weights.
+        device: Device the tensors are read onto.
+        dtype: Optional dtype floating point tensors are cast to while reading.
+        cache_key: (path, size, mtime_ns) of the file, used to reuse the
+            conversion plan from an earlier load of the same file.
+    """
+    if weight_name.endswith(".safetensors"):
+        state_dict = _read_safetensors(os.path.join(str(lora_path), weight_name), device, dtype)
+    else:
+        # .pt / .bin checkpoints go through the regular diffusers loader
+        state_dict = _lazy("_fetch_state_dict")(
+            lora_path,
+            weight_name,
+            True,
+            True,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None)
+        # _fetch_state_dict ignores device and dtype; cast floating point tensors here
+        state_dict = {k: _to(v, device, dtype) for k, v in state_dict.items()}
+
+    rewrite = _CONVERSION_PLANS.get(cache_key) if cache_key is not None else None
+    if rewrite is not None:
+        _CONVERSION_PLANS.move_to_end(cache_key)
+        state_dict = rewrite(state_dict)
+    elif cache_key is not None and cache_key not in _CONVERSION_PLANS:
+        # First conversion of this file: keep the raw tensors alive until the plan
+        # is built so their ids stay unique. Peak memory is raw plus converted here.
+        raw_tensors = {id(v): (k, v) for k, v in state_dict.items()}
+        state_dict = _lazy("_convert_hunyuan_video_lora_to_diffusers")(state_dict)
+        _store_conversion_plan(cache_key, _build_rewrite_fn(raw_tensors, state_dict))
+        del raw_tensors
+    else:
+        # The converter pops every key from the input dict while renaming, so only
+        # one dict holds the tensors at any time.
+        state_dict = _lazy("_convert_hunyuan_video_lora_to_diffusers")(state_dict)
+
+    # Intern the keys once: they share long prefixes and are hashed and compared
+    # repeatedly by the cache, the in-place reload path and PEFT.
+    return {sys.intern(k): v for k, v in state_dict.items()}
+
+
+# Generated key-rewrite functions, keyed by (path, size, mtime_ns). None marks a
+# file whose conversion can't be replayed as renames and views. Only the newest
+# version of each file is kept, and at most _CONVERSION_PLANS_MAX files (LRU).
+_CONVERSION_PLANS: "OrderedDict[Tuple[str, int, int], Optional[Callable]]" = OrderedDict()
+_CONVERSION_PLANS_MAX = 64
+
+
+def _store_conversion_plan(cache_key: Tuple[str, int, int], rewrite: Optional[Callable]):
+    for key in [k for k in _CONVERSION_PLANS if k[0] == cache_key[0]]:
+        del _CONVERSION_PLANS[key]
+    _CONVERSION_PLANS[cache_key] = rewrite
+    while len(_CONVERSION_PLANS) > _CONVERSION_PLANS_MAX:
+        _CONVERSION_PLANS.popitem(last=False)
+
+
+def _build_rewrite_fn(raw_tensors: Dict[int, Tuple[str, torch.Tensor]], converted: Dict[str, torch.Tensor]) -> Optional[Callable]:
+    """
+    Turn one run of the Hunyuan->diffusers converter into a straight-line function.
+
+    Every converted tensor is either a raw tensor under a new key or a view of one
+    (the qkv / linear1 splits), so the conversion is replayed as a single dict
+    literal of `raw[...]` lookups and `as_strided` views. The function is
+    generated with exec so CPython builds the dict from constants, skipping the
+    converter's string matching on later loads. Returns None when a tensor was
+    produced by a real op such as torch.cat.
+
+    Raw tensors read from a file are themselves views of a buffer, so a split's
+    `_base` is that buffer rather than the raw tensor. Views are therefore matched
+    to the raw tensor whose storage range contains them.
+    """
+    raw_by_storage = {}
+    for src, raw in raw_tensors.values():
+        raw_by_storage.setdefault(raw.untyped_storage().data_ptr(), []).append((src, raw))
+
+    items = []
+    for dst, tensor in converted.items():
+        if id(tensor) in raw_tensors:
+            src, _ = raw_tensors[id(tensor)]
+            items.append(f"{dst!r}: raw[{src!r}]")
+            continue
+        owner = None
+        for src, raw in raw_by_storage.get(tensor.untyped_storage().data_ptr(), []):
+            start = raw.storage_offset()
+            if raw.dtype == tensor.dtype and start <= tensor.storage_offset() < start + raw.numel():
+                owner = src, raw
+                break
+        if owner is None:
+            return None
+        src, raw = owner
+        offset = tensor.storage_offset() - raw.storage_offset()
+        items.append(f"{dst!r}: _view(raw[{src!r}], {tuple(tensor.shape)!r}, {tuple(tensor.stride())!r}, {offset})")
+
+    code = "def _rewrite(raw):\n    return {\n" + "".join(f"        {item},\n" for item in items) + "    }\n"
+    namespace = {"_view": _view}
+    exec(code, namespace)
+    return namespace["_rewrite"]
+
+
+def _view(tensor: torch.Tensor, size, stride, offset: int) -> torch.Tensor:
+    return tensor.as_strided(size, stride, tensor.storage_offset() + offset)
+
+
+# Converted LoRA state dicts kept as private copies in CPU memory (never views of
+# the file's memory map), keyed by (path, size, mtime_ns) and evicted least-recently-used first once they exceed FP_LORA_CACHE_MAX_BYTES
+# (default 512 MiB, 0 disables the cache).
+_STATE_DICT_CACHE: "OrderedDict[Tuple[str, int, int], Dict[str, torch.Tensor]]" = OrderedDict()
+_STATE_DICT_CACHE_MAX_BYTES = int(os.environ.get("FP_LORA_CACHE_MAX_BYTES", 512 * 1024 ** 2))
+
+
+def _state_dict_nbytes(state_dict: Dict[str, torch.Tensor]) -> int:
+    unique = {id(v): v for v in state_dict.values()}
+    return sum(v.numel() * v.element_size() for v in unique.values())
+
+
+def _cache_state_dict(key: Tuple[str, int, int], state_dict: Dict[str, torch.Tensor]):
+    """
+    Store a CPU state dict in the LoRA cache, evicting the oldest entries when
+    the cache grows past its size limit.
+
+    Tensors read from a safetensors file are views into its memory map, so they
+    are cloned first: the cache then holds no mapping open (which would lock the
+    file on Windows) and cached loads really skip disk I/O. Keys that share one
+    tensor (e.g. lora_A reused for q/k/v) keep sharing one clone.
+    """
+    clones = {}
+    for v in state_dict.values():
+        if id(v) not in clones:
+            clones[id(v)] = v.clone()
+    state_dict = {k: clones[id(v)] for k, v in state_dict.items()}
+
+    _STATE_DICT_CACHE[key] = state_dict
+    total = sum(_state_dict_nbytes(sd) for sd in _STATE_DICT_CACHE.values())
+    while total > _STATE_DICT_CACHE_MAX_BYTES and len(_STATE_DICT_CACHE) > 1:
+        _, evicted = _STATE_DICT_CACHE.popitem(last=False)
+        total -= _state_dict_nbytes(evicted)
+    return state_dict
+
+
+def clear_lora_cache():
+    """
+    Drop every cached LoRA state dict and conversion plan.
+    """
+    _STATE_DICT_CACHE.clear()
+    _CONVERSION_PLANS.clear()
+
+
+def _cache_key(lora_path: Path, weight_name: str) -> Tuple[str, int, int]:
+    path = os.path.join(str(lora_path), weight_name)
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def _cached_state_dict(lora_path: Path, weight_name: str) -> Optional[Dict[str, torch.Tensor]]:
+    """
+    Return the cached CPU state dict for a LoRA file, or None on a miss.
+    The tensors are the cached ones: callers must copy, never keep, them.
+    """
+    key = _cache_key(lora_path, weight_name)
+    state_dict = _STATE_DICT_CACHE.get(key)
+    if state_dict is not None:
+        _STATE_DICT_CACHE.move_to_end(key)
+    return state_dict
+
+
+def _load_state_dict(lora_path: Path, weight_name: str, device: Union[str, torch.device] = "cpu", dtype: Optional[torch.dtype] = None) -> Dict[str, torch.Tensor]:
+    """
+    Load a converted LoRA state dict onto `device` / `dtype`.
+
+    Files that fit in the cache are read once and served from CPU memory on
+    later calls, so toggling the same LoRA skips disk I/O and key conversion.
+    The returned tensors never alias the cached ones. An uncached file loaded
+    for a transformer that lives on the GPU is read by safetensors directly
+    into GPU memory in the final dtype, without building a CPU copy first.
+    """
+    key = _cache_key(lora_path, weight_name)
+
+    state_dict = _cached_state_dict(lora_path, weight_name)
+    if state_dict is None:
+        if torch.device(device).type == "cuda" or key[1] > _STATE_DICT_CACHE_MAX_BYTES:
+            return _read_lora_file(lora_path, weight_name, device, dtype, cache_key=key)
+        state_dict = _cache_state_dict(key, _read_lora_file(lora_path, weight_name, "cpu", cache_key=key))
+
+    return _copy_state_dict(state_dict, device, dtype)
+
+
+def _copy_state_dict(state_dict: Dict[str, torch.Tensor], device: Union[str, torch.device], dtype: Optional[torch.dtype] = None) -> Dict[str, torch.Tensor]:
+    """
+    Copy a state dict to `device` / `dtype`, allocating every destination up front
+    and issuing the copies as one multi-tensor `_foreach_copy_` call.
+    """
+    keys = list(state_dict)
+    src = [state_dict[k] for k in keys]
+    dst = [torch.empty_like(t, device=device, dtype=dtype if dtype is not None and t.is_floating_point() else t.dtype) for t in src]
+
+    if torch.device(device).type == "cuda":
+        # The cache is kept in pageable memory; stage through pinned buffers only for
+        # a real host-to-device copy. Non-blocking copies from pinned memory return to
+        # the host right away and stay ordered on the current stream.
+        src = [t.pin_memory() for t in src]
+
+    _foreach_copy(dst, src)
+    return dict(zip(keys, dst))
+
+
+def _foreach_copy(dst: List[torch.Tensor], src: List[torch.Tensor]):
+    if hasattr(torch, '_foreach_copy_'):
+        torch._foreach_copy_(dst, src, non_blocking=True)
+    else:
+        for d, t in zip(dst, src):
+            d.copy_(t, non_blocking=True)
+
+
+def _load_lora_adapter(transformer, state_dict: Dict[str, torch.Tensor], adapter_name: str):
+    """
+    Inject a converted LoRA state dict into the transformer as `adapter_name`.
+
+    `state_dict` must already be on the transformer's device and dtype, as
+    returned by _load_state_dict, so PEFT can assign the tensors as-is. With
+    `low_cpu_mem_usage=True` (newer diffusers) the LoRA layers are created on the
+    meta device and the weights are assigned directly instead of being randomly
+    initialised and then overwritten.
+    """
+    # diffusers rejects low_cpu_mem_usage with older PEFT; older diffusers ignore it via **kwargs
+    low_cpu_mem_usage = _lazy("is_peft_version")(">=", "0.13.1")
+    transformer.load_lora_adapter(state_dict, network_alphas=None, adapter_name=adapter_name, low_cpu_mem_usage=low_cpu_mem_usage)
+
+    _cache_lora_scaling_modules(transformer)
+
+
+def _cache_lora_scaling_modules(transformer):
+    """
+    Remember which modules carry a LoRA `scaling` attribute.
+
+    Only a small fraction of the transformer's modules are LoRA layers, so
+    apply_lora_scaling walks this list instead of the whole module tree.
+    """
+    transformer._lora_scaling_modules = [m for m in transformer.modules() if hasattr(m, 'scaling')]
+    return transformer._lora_scaling_modules
+
+
+def forget_lora_layers(transformer):
+    """
+    Drop the cached list of LoRA-bearing modules so removed LoRA layers are not
+    kept alive. Call this after removing LoRAs without unload_all_loras.
+    """
+    transformer._lora_scaling_modules = None
+
+
+def _lora_layers(transformer, adapter_name: str):
+    """
+    Return the cached LoRA-bearing modules, rebuilding the list when it is missing
+    or stale (e.g. after an unload that bypassed unload_all_loras).
+    """
+    modules = getattr(transformer, '_lora_scaling_modules', None)
+    if modules is None or not any(_has_adapter(m, adapter_name) for m in modules):
+        modules = _cache_lora_scaling_modules(transformer)
+    return modules
+
+
+def _has_adapter(module, adapter_name: str) -> bool:
+    return isinstance(module.scaling, dict) and adapter_name in module.scaling
+
+
+# File names whose only '.' is the extension can be used as adapter names as-is
+_SAFE_NAME_RE = re.compile(r'^([A-Za-z0-9_\-]+)\.(safetensors|bin|pt)$')
+
+
+def _copy_into_adapter(transformer, state_dict: Dict[str, torch.Tensor], adapter_name: str) -> bool:
+    """
+    Overwrite the weights of an already loaded adapter in place.
+
+    Only done when `state_dict` targets exactly the same LoRA parameters with the
+    same shapes, e.g. reloading the same file or a sibling LoRA of the same rank.
+    This skips tearing down and re-injecting the PEFT layers. `state_dict` may be
+    on any device and dtype; the copy converts. Like a fresh load, the adapter
+    ends up at scale 1.0. Returns False when the adapter has to be reloaded instead.
+    """
+    adapter_params = {
+        name: param for name, param in transformer.named_parameters()
+        if f".lora_A.{adapter_name}." in name or f".lora_B.{adapter_name}." in name
+    }
+    if len(adapter_params) != len(state_dict):
+        return False
+
+    dst, src = [], []
+    for key, value in state_dict.items():
+        name = key.removeprefix("transformer.")
+        name = name.replace(".lora_A.", f".lora_A.{adapter_name}.").replace(".lora_B.", f".lora_B.{adapter_name}.")
+        param = adapter_params.get(name)
+        if param is None or param.shape != value.shape:
+            return False
+        dst.append(param)
+        src.append(value)
+
+    with torch.no_grad():
+        _foreach_copy(dst, src)
+
+    modules = getattr(transformer, '_lora_scaling_modules', None) or _cache_lora_scaling_modules(transformer)
+    for module in modules:
+        if hasattr(module, 'set_scale') and _has_adapter(module, adapter_name):
+            module.set_scale(adapter_name, 1.0)
+    return True
+
+
+@torch.no_grad()
 def load_lora(transformer, lora_path: Path, weight_name: Optional[str] = "pytorch_lora_weights.safetensors"):
     """
     Load LoRA weights into the transformer model.
@@ -17,26 +438,14 @@ def load_lora(transformer, lora_path: Path, weight_name: Optional[str] = "pytorc
 
     """
     
-    state_dict = _fetch_state_dict(
-        lora_path,
-        weight_name,
-        True,
-        True,
-        None,
-        None,
-        None,
-        None,
-        None,
-        None,
-        None,
-        None)
-
-    state_dict = _convert_hunyuan_video_lora_to_diffusers(state_dict)
-    
     # Fix adapter name handling to avoid PyTorch module naming issues
     # The module name in the state_dict must not include a . in the name
     # See https://github.com/pytorch/pytorch/pull/6639/files#diff-4be56271f7bfe650e3521c81fd363da58f109cd23ee80d243156d2d6ccda6263R133-R134
-    adapter_name = str(PurePath(weight_name).with_suffix('')).replace('.', '_DOT_')
+    safe_name = _SAFE_NAME_RE.match(weight_name)
+    if safe_name:
+        adapter_name = safe_name.group(1)
+    else:
+        adapter_name = str(PurePath(weight_name).with_suffix('')).replace('.', '_DOT_')
     if '_DOT_' in adapter_name:
         print(
             f"LoRA file '{weight_name}' contains a '.' in the name. " +
@@ -44,24 +453,48 @@ def load_lora(transformer, lora_path: Path, weight_name: Optional[str] = "pytorc
             f" Using '{adapter_name}' as the adapter name to be safe."
         )
     
-    # Check if adapter already exists and delete it if it does
-    if hasattr(transformer, 'peft_config') and adapter_name in transformer.peft_config:
+    # Check if adapter already exists: reuse its layers when the shapes match, otherwise delete it.
+    # A cached file is copied straight from the cache into the existing layers.
+    peft_config = getattr(transformer, 'peft_config', None) or {}
+    cached = _cached_state_dict(lora_path, weight_name) if adapter_name in peft_config else None
+    if cached is not None and _copy_into_adapter(transformer, cached, adapter_name):
+        print(f"Adapter '{adapter_name}' already exists with matching shapes. Updated its weights in place.")
+        return transformer
+
+    state_dict = _load_state_dict(lora_path, weight_name, transformer.device, transformer.dtype)
+
+    if adapter_name in peft_config:
+        if cached is None and _copy_into_adapter(transformer, state_dict, adapter_name):
+            print(f"Adapter '{adapter_name}' already exists with matching shapes. Updated its weights in place.")
+            return transformer
         print(f"Adapter '{adapter_name}' already exists. Removing it before loading again.")
         # Use delete_adapters (plural) instead of delete_adapter
         transformer.delete_adapters([adapter_name])
+        forget_lora_layers(transformer)
     
     # Load the adapter with the proper name
-    transformer.load_lora_adapter(state_dict, network_alphas=None, adapter_name=adapter_name)
+    _load_lora_adapter(transformer, state_dict, adapter_name)
     print(f"LoRA weights '{adapter_name}' loaded successfully.")
     return transformer
 
-def unload_all_loras(transformer):
+@torch.inference_mode()
+def unload_all_loras(transformer, release_memory: bool = False):
     """
     Completely unload all LoRA adapters from the transformer model.
+
+    Args:
+        transformer: The transformer model with loaded LoRA adapters
+        release_memory: Also clear the LoRA state-dict cache and run gc.collect()
+            and torch.cuda.empty_cache().
+            Leave this off when another LoRA is loaded right afterwards: the
+            caching allocator reuses the freed blocks, and empty_cache cannot
+            release blocks that are still in use anyway. Pass True when the
+            memory should really go back, e.g. before switching base models.
     """
-    if hasattr(transformer, 'peft_config') and transformer.peft_config:
+    peft_config = getattr(transformer, 'peft_config', None) or {}
+    if peft_config:
         # Get all adapter names
-        adapter_names = list(transformer.peft_config.keys())
+        adapter_names = list(peft_config.keys())
         
         if adapter_names:
             print(f"Removing all LoRA adapters: {', '.join(adapter_names)}")
@@ -71,33 +504,30 @@ def unload_all_loras(transformer):
             # Force cleanup of any remaining adapter references
             if hasattr(transformer, 'active_adapter'):
                 transformer.active_adapter = None
-                
-            # Clear any cached states
-            for module in transformer.modules():
-                if hasattr(module, 'lora_A'):
-                    if isinstance(module.lora_A, dict):
-                        module.lora_A.clear()
-                if hasattr(module, 'lora_B'):
-                    if isinstance(module.lora_B, dict):
-                        module.lora_B.clear()
-                if hasattr(module, 'scaling'):
-                    if isinstance(module.scaling, dict):
-                        module.scaling.clear()
-            
+            forget_lora_layers(transformer)
+
+            # delete_adapters already drops the lora_A / lora_B / scaling entries;
+            # walking the module tree to double-check is opt-in
+            if __debug__ and os.getenv("FP_VERIFY_LORA_UNLOAD"):
+                assert not any(getattr(m, 'lora_A', {}) for m in transformer.modules()), \
+                    "LoRA weights are still attached after delete_adapters"
+
             print("All LoRA adapters have been completely removed.")
         else:
             print("No LoRA adapters found to remove.")
     else:
         print("Model doesn't have any LoRA adapters or peft_config.")
     
-    # Force garbage collection
-    import gc
-    gc.collect()
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
+    if release_memory:
+        clear_lora_cache()
+        import gc
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
     
     return transformer
 
+@torch.inference_mode()
 def apply_lora_scaling(transformer, adapter_name: str, lora_strength: float):
     """
     Apply LoRA scaling/strength to a specific adapter.
@@ -109,34 +539,57 @@ def apply_lora_scaling(transformer, adapter_name: str, lora_strength: float):
     """
     print(f"Setting LoRA '{adapter_name}' strength to {lora_strength}")
     
-    # Set scaling for this LoRA by iterating through modules
-    for name, module in transformer.named_modules():
-        if hasattr(module, 'scaling'):
-            if isinstance(module.scaling, dict):
-                # Handle ModuleDict case (PEFT implementation)
-                if adapter_name in module.scaling:
-                    if isinstance(module.scaling[adapter_name], torch.Tensor):
-                        module.scaling[adapter_name] = torch.tensor(
-                            lora_strength, device=module.scaling[adapter_name].device
-                        )
-                    else:
-                        module.scaling[adapter_name] = lora_strength
-            else:
-                # Handle direct attribute case for scaling if needed
-                if isinstance(module.scaling, torch.Tensor):
-                    module.scaling = torch.tensor(
-                        lora_strength, device=module.scaling.device
-                    )
+    # Set scaling for this LoRA on the LoRA-bearing modules only
+    modules = _lora_layers(transformer, adapter_name)
+
+    # One scalar tensor per device, shared by every module on that device
+    scalar_by_device = {}
+
+    def strength_on(device):
+        if device not in scalar_by_device:
+            scalar_by_device[device] = torch.tensor(lora_strength, device=device)
+        return scalar_by_device[device]
+
+    for module in modules:
+        if isinstance(module.scaling, dict):
+            # Handle ModuleDict case (PEFT implementation)
+            if adapter_name in module.scaling:
+                if isinstance(module.scaling[adapter_name], torch.Tensor):
+                    module.scaling[adapter_name] = strength_on(module.scaling[adapter_name].device)
                 else:
-                    module.scaling = lora_strength
+                    module.scaling[adapter_name] = lora_strength
+        else:
+            # Handle direct attribute case for scaling if needed
+            if isinstance(module.scaling, torch.Tensor):
+                module.scaling = strength_on(module.scaling.device)
+            else:
+                module.scaling = lora_strength
     
 # TODO(neph1): remove when HunyuanVideoTransformer3DModelPacked is in _SET_ADAPTER_SCALE_FN_MAPPING
+@torch.inference_mode()
 def set_adapters(
         transformer,
         adapter_names: Union[List[str], str],
         weights: Optional[Union[float, Dict, List[float], List[Dict], List[None]]] = None,
     ):
 
+    # Fast path for a single adapter with a plain strength (e.g. a UI slider): only the
+    # cached LoRA layers are touched instead of expanding the weight over every block.
+    # set_scale applies weight * lora_alpha / r per layer, exactly like
+    # set_weights_and_activate_adapters, so mixed-rank LoRAs get the same strength.
+    single_name = adapter_names if isinstance(adapter_names, str) else (adapter_names[0] if len(adapter_names) == 1 else None)
+    single_weight = weights[0] if isinstance(weights, list) and len(weights) == 1 else weights
+    if (
+        single_name is not None
+        and isinstance(single_weight, (int, float))
+        and single_name in (getattr(transformer, 'peft_config', None) or {})
+    ):
+        for module in _lora_layers(transformer, single_name):
+            if hasattr(module, 'set_adapter'):
+                module.set_adapter([single_name])
+                module.set_scale(single_name, float(single_weight))
+        return
+
     adapter_names = [adapter_names] if isinstance(adapter_names, str) else adapter_names
 
     # Expand weights into a list, one entry per adapter
@@ -154,7 +607,7 @@ def set_adapters(
     weights = [w if w is not None else 1.0 for w in weights]
 
     # e.g. [{...}, 7] -> [{expanded dict...}, 7]
-    scale_expansion_fn = _SET_ADAPTER_SCALE_FN_MAPPING["HunyuanVideoTransformer3DModel"]
+    scale_expansion_fn = _lazy("_SET_ADAPTER_SCALE_FN_MAPPING")["HunyuanVideoTransformer3DModel"]
     weights = scale_expansion_fn(transformer, weights)
 
-    set_weights_and_activate_adapters(transformer, adapter_names, weights)
\ No newline at end of file
+    _lazy("set_weights_and_activate_adapters")(transformer, adapter_names, weights)
\ No newline at end of file
@@ -1,10 +1,11 @@
 from pathlib import Path
 from typing import Dict, List, Optional, Union
-from diffusers.loaders.lora_pipeline import _fetch_state_dict
-from diffusers.loaders.lora_conversion_utils import _convert_hunyuan_video_lora_to_diffusers
 from diffusers.utils.peft_utils import set_weights_and_activate_adapters
 from diffusers.loaders.peft import _SET_ADAPTER_SCALE_FN_MAPPING
+from diffusers_helper.load_lora import _load_state_dict, _load_lora_adapter
+import torch
 
+@torch.no_grad()
 def load_lora(transformer, lora_path: Path, weight_name: Optional[str] = "pytorch_lora_weights.safetensors"):
     """
     Load LoRA weights into the transformer model.
@@ -16,24 +17,9 @@ def load_lora(transformer, lora_path: Path, weight_name: Optional[str] = "pytorc
 
     """
     
-    state_dict = _fetch_state_dict(
-    lora_path,
-    weight_name,
-    True,
-    True,
-    None,
-    None,
-    None,
-    None,
-    None,
-    None,
-    None,
-    None)
-
-
-    state_dict = _convert_hunyuan_video_lora_to_diffusers(state_dict)
+    state_dict = _load_state_dict(lora_path, weight_name, transformer.device, transformer.dtype)
     
-    transformer.load_lora_adapter(state_dict, network_alphas=None, adapter_name=weight_name.split(".")[0])
+    _load_lora_adapter(transformer, state_dict, weight_name.split(".")[0])
     print("LoRA weights loaded successfully.")
     return transformer
     